@@ -0,0 +1,242 @@
+from benchmark_classes.cache_hitrate_benchmark import CacheHitrateBenchmark
+from benchmark_classes.random_prefetcher import RandomPrefetcher
+from benchmark_classes.popularity_prefetcher import PopularityPrefetcher, ContextPopularityPrefetcher, WeightedRandomPrefetcher
+from benchmark_classes.bayes_prefetcher import BayesPrefetcher
+from benchmark_classes.cost_aware_prefetcher import CostAwarePrefetcher
+from benchmark_classes.markov_prefetcher import MarkovPrefetcher
+from benchmark_classes.model_evaluation import ModelEvaluator
+from benchmark_classes.hitrate_generator import HitrateGenerator
+from benchmark_classes.model import MultinomialNBClassifier
+from benchmark_classes.sharded_model import grid_regions, train_shards, save_shards, ShardRouter
+from benchmark_classes.performance_benchmark import PerformanceBenchmark, save_run, find_baseline, compare_runs, config_differences
+from benchmark_classes.synthetic_fixtures import generate_poi_df, generate_access_df, generate_factor_states, generate_tile_sizes, generate_tile_sequences
+import argparse
+import datetime
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+features = {
+    'temp': [0, 1, 2, 3, 4],
+    'snow': [0, 1, 2, 3, 4],
+    'wspd': [0, 1, 2, 3, 4],
+    'coco': [0, 1, 2],
+    'vacation': [0, 1],
+    'holiday': [0, 1],
+    'month': [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12],
+    'weekday': [0, 1, 2, 3, 4, 5, 6],
+    'hour': [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23]
+}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline-Performance-Benchmark mit synthetischen Daten (ohne PostGIS)")
+    parser.add_argument('--grid', type=int, nargs=2, default=[40, 20], metavar=('X', 'Y'), help="Anzahl der Tiles in x- und y-Richtung")
+    parser.add_argument('--rows', type=int, default=2000, help="Anzahl der synthetischen Zugriffsdatensätze (Stunden)")
+    parser.add_argument('--pois', type=int, default=500, help="Anzahl der synthetischen POIs")
+    parser.add_argument('--tile-density', type=float, default=0.3, help="Anteil der Tiles mit Zugriffen")
+    parser.add_argument('--batch-size', type=int, default=50, help="Anzahl der Faktorzustände für Batch-Vorhersagen")
+    parser.add_argument('--top-k', type=int, default=100, help="Anzahl der vorzuladenden Tiles")
+    parser.add_argument('--byte-budget', type=int, default=None, help="Byte-Budget des kostenbewussten Prefetchers (Standard: top-k durchschnittliche Tiles)")
+    parser.add_argument('--smoothing-radius', type=int, default=1, help="Radius (in Tiles) der räumlichen Glättung")
+    parser.add_argument('--smoothing-sigma', type=float, default=0.5, help="Standardabweichung des Gauß-Kerns der räumlichen Glättung")
+    parser.add_argument('--smoothing-self-weight', type=float, default=0.9, help="Anteil des eigenen Werts eines Tiles nach der Glättung")
+    parser.add_argument('--shards', type=int, nargs=2, default=[2, 2], metavar=('X', 'Y'), help="Aufteilung des Gitters in Regionen-Shards")
+    parser.add_argument('--sessions', type=int, default=500, help="Anzahl der synthetischen Sitzungen (Anfragefolgen)")
+    parser.add_argument('--session-length', type=int, default=20, help="Anfragen pro Sitzung")
+    parser.add_argument('--repeats', type=int, default=7, help="Wiederholungen pro Messung (jeweils mit innerer Schleife von mind. 0.2s)")
+    parser.add_argument('--one-shot-repeats', type=int, default=3, help="Wiederholungen für einmalige Messungen wie das Training")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--history', default='./data/perf_history.json', help="JSON-Datei mit allen bisherigen Läufen")
+    parser.add_argument('--label', default=None, help="Bezeichnung dieses Laufs")
+    parser.add_argument('--compare', action='store_true', help="Mit einem Referenzlauf vergleichen")
+    parser.add_argument('--baseline', default=None, help="Bezeichnung des Referenzlaufs (Standard: letzter Lauf mit gleichen Fixture-Einstellungen)")
+    parser.add_argument('--threshold', type=float, default=0.15, help="Erlaubte relative Verlangsamung, bevor eine Regression gemeldet wird")
+    parser.add_argument('--one-shot-threshold', type=float, default=0.5, help="Erlaubte relative Verlangsamung für einmalige Messungen")
+    args = parser.parse_args()
+
+    # Jeder Shard braucht mindestens eine Tile-Spalte und -Zeile
+    if not 1 <= args.shards[0] <= args.grid[0] or not 1 <= args.shards[1] <= args.grid[1]:
+        parser.error("--shards must be between 1 and the grid size in each direction")
+
+    return args
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    grid_size = tuple(args.grid)
+
+    # Synthetische Fixtures anstelle von Datenbank, model.pkl und synth_access_data.csv
+    poi_df = generate_poi_df(args.pois, grid_size, seed=args.seed)
+    access_df = generate_access_df(args.rows, grid_size, features, tile_density=args.tile_density, poi_df=poi_df, seed=args.seed)
+    factor_states = generate_factor_states(args.batch_size, features, seed=args.seed)
+    tile_sizes = generate_tile_sizes(grid_size, poi_df, seed=args.seed)
+    sequences = generate_tile_sequences(args.sessions, args.session_length, grid_size, seed=args.seed)
+    train_sequences, test_sequences = sequences[:len(sequences)*4//5], sequences[len(sequences)*4//5:]
+    print("Generated fixtures: {} POIs, {} rows, {} accessed tiles".format(len(poi_df), len(access_df), len(access_df.columns) - len(features)))
+
+    # Zufallsgeneratoren fixieren, damit Hit-Generierung und Benchmark bei jedem Lauf dieselbe Arbeit leisten
+    random.seed(args.seed)
+    np.random.seed(args.seed)
+    perf = PerformanceBenchmark(repeats=args.repeats, one_shot_repeats=args.one_shot_repeats, seed=args.seed)
+    tile_x_range, tile_y_range = (0, grid_size[0]), (0, grid_size[1])
+
+    # Training ist mit Abstand die teuerste Messung und wird daher ohne innere Schleife gemessen
+    models = []
+    perf.measure('model_train', lambda: models.append(MultinomialNBClassifier(access_df, tile_x_range, tile_y_range, features)), one_shot=True)
+    model = models[-1]
+
+    tmp_dir = tempfile.mkdtemp()
+    model_path = os.path.join(tmp_dir, 'model.pkl')
+    model.save(model_path)
+
+    perf.add('model_load', lambda: MultinomialNBClassifier.load(model_path))
+    bayes_prefetcher = BayesPrefetcher(model_path)
+    smoothed_bayes_prefetcher = BayesPrefetcher(model_path, smoothing={'radius': args.smoothing_radius, 'sigma': args.smoothing_sigma, 'self_weight': args.smoothing_self_weight})
+    cost_aware_prefetcher = CostAwarePrefetcher(model_path, tile_sizes, args.byte_budget)
+
+    # Regionen-Shards mit eigenen Gittergrenzen, parallel bewertet und per Top-k zusammengeführt
+    regions = grid_regions(tile_x_range, tile_y_range, *args.shards)
+    shards = []
+    perf.measure('shard_train', lambda: shards.append(train_shards(access_df, regions, features)), one_shot=True)
+    shard_dir = os.path.join(tmp_dir, 'shards')
+    save_shards(shard_dir, shards[-1])
+
+    shard_router = ShardRouter(shard_dir)
+    perf.add('shard_top_k', lambda: shard_router.choose_tiles(factor_states[0], args.top_k))
+
+    # Sitzungsbasierte Vorhersage: Übergänge Tile -> nächstes Tile, optional mit dem Bayes-Modell gemischt
+    perf.add('markov_train', lambda: MarkovPrefetcher(train_sequences))
+    markov_prefetcher = MarkovPrefetcher(train_sequences)
+    blended_markov_prefetcher = MarkovPrefetcher(train_sequences, bayes_model_path=model_path, blend=0.3)
+
+    perf.add('predict_single', lambda: model.predict(factor_states[0]))
+    perf.add('predict_batch', lambda: [model.predict(factors) for factors in factor_states], n_ops=len(factor_states))
+    evaluator = ModelEvaluator(model, features)
+    perf.add('evaluate_rows', lambda: evaluator.evaluate(access_df, k=args.top_k), n_ops=len(access_df))
+    perf.add('top_k', lambda: bayes_prefetcher.choose_tiles(factor_states[0], args.top_k))
+    perf.add('top_k_smoothed', lambda: smoothed_bayes_prefetcher.choose_tiles(factor_states[0], args.top_k))
+    # Schnelle Abfragen laufen über alle Faktorzustände, sonst misst man v.a. den Overhead des Aufrufs
+    session_queries = [dict(factors, tile=sequence[0]) for factors, sequence in zip(factor_states, test_sequences)]
+    perf.add('markov_top_k', lambda: [markov_prefetcher.choose_tiles(query, args.top_k) for query in session_queries], n_ops=len(session_queries))
+    perf.add('markov_blend_top_k', lambda: [blended_markov_prefetcher.choose_tiles(query, args.top_k) for query in session_queries], n_ops=len(session_queries))
+    perf.add('cost_aware_plan', lambda: cost_aware_prefetcher.choose_tiles(factor_states[0], args.top_k))
+
+    hitrate_generator = HitrateGenerator(poi_df=poi_df)
+    perf.add('hit_gen_setup', lambda: hitrate_generator.make_hit_gen(factor_states[0]))
+    hit_gen = hitrate_generator.make_hit_gen(factor_states[0])
+    perf.add('hit_gen_sample', lambda: next(hit_gen))
+
+    access_tiles = [tuple(int(p) for p in t_id.split(';')) for t_id in access_df.drop(columns=list(features.keys())).columns]
+    random_prefetcher = RandomPrefetcher(access_tiles)
+    popularity_prefetcher = PopularityPrefetcher(access_df)
+    hour_popularity_prefetcher = ContextPopularityPrefetcher(access_df, ('hour',))
+    weighted_random_prefetcher = WeightedRandomPrefetcher(access_df, seed=args.seed)
+    perf.add('random_choose', lambda: [random_prefetcher.choose_tiles(factors, args.top_k) for factors in factor_states], n_ops=len(factor_states))
+    perf.add('popularity_choose', lambda: [popularity_prefetcher.choose_tiles(factors, args.top_k) for factors in factor_states], n_ops=len(factor_states))
+    perf.add('hour_popularity_choose', lambda: [hour_popularity_prefetcher.choose_tiles(factors, args.top_k) for factors in factor_states], n_ops=len(factor_states))
+    perf.add('weighted_random_choose', lambda: [weighted_random_prefetcher.choose_tiles(factors, args.top_k) for factors in factor_states], n_ops=len(factor_states))
+
+    caches = {
+        'RandomPrefetcher': random_prefetcher.choose_tiles,
+        'PopularityPrefetcher': popularity_prefetcher.choose_tiles,
+        'HourPopularityPrefetcher': hour_popularity_prefetcher.choose_tiles,
+        'WeightedRandomPrefetcher': weighted_random_prefetcher.choose_tiles,
+        'BayesPrefetcher': bayes_prefetcher.choose_tiles,
+        'SmoothedBayesPrefetcher': smoothed_bayes_prefetcher.choose_tiles
+    }
+
+    # Hit-Rate bei gleicher Tile-Anzahl, und bei gleichem Byte-Budget für alle Caches inkl. kostenbewusstem Prefetcher
+    benchmark = CacheHitrateBenchmark(features)
+    budget_benchmark = CacheHitrateBenchmark(features, tile_sizes)
+    for alg_name, choose_tiles in caches.items():
+        benchmark.add_cache(alg_name, choose_tiles)
+        budget_benchmark.add_cache(alg_name, choose_tiles)
+    budget_benchmark.add_cache('CostAwarePrefetcher', cost_aware_prefetcher.choose_tiles)
+
+    n_random, n_reruns = 5, 5
+    perf.add('benchmark_rerun', lambda: benchmark.benchmark_random(hitrate_generator.make_hit_gen, n_random=n_random, n_reruns=n_reruns), n_ops=n_random * n_reruns)
+
+    random.seed(args.seed)
+    np.random.seed(args.seed)
+    hit_rates = benchmark.benchmark_random(hitrate_generator.make_hit_gen, n_random=n_random, n_reruns=n_reruns)
+    for alg_name, hit_rate in hit_rates.items():
+        print("Algorithm: {} | Hit Rate%: {:.2f}".format(alg_name, hit_rate * 100))
+
+    random.seed(args.seed)
+    np.random.seed(args.seed)
+    budget_hit_rates, budget_byte_hit_rates = budget_benchmark.benchmark_random(hitrate_generator.make_hit_gen, n_random=n_random, n_reruns=n_reruns, return_byte_hitrate=True, equal_byte_budget=True)
+    for alg_name, hit_rate in budget_hit_rates.items():
+        print("Algorithm: {} | Equal Byte Budget | Hit Rate%: {:.2f} | Byte Hit Rate%: {:.2f}".format(alg_name, hit_rate * 100, budget_byte_hit_rates[alg_name] * 100))
+
+    sequence_benchmark = CacheHitrateBenchmark(features)
+    sequence_benchmark.add_cache('PopularityPrefetcher', popularity_prefetcher.choose_tiles)
+    sequence_benchmark.add_cache('BayesPrefetcher', bayes_prefetcher.choose_tiles)
+    sequence_benchmark.add_cache('MarkovPrefetcher', markov_prefetcher.choose_tiles)
+    sequence_benchmark.add_cache('BlendedMarkovPrefetcher', blended_markov_prefetcher.choose_tiles)
+    sequence_hit_rates = sequence_benchmark.benchmark_sequences(test_sequences[:20], args.session_length // 2)
+    for alg_name, hit_rate in sequence_hit_rates.items():
+        print("Algorithm: {} | Next-Tile Hit Rate%: {:.2f}".format(alg_name, hit_rate * 100))
+
+    # Alle schnellen Messungen laufen gemeinsam und abwechselnd, erst danach wird aufgeräumt
+    perf.run()
+    shard_router.close()
+    shutil.rmtree(tmp_dir)
+
+    run = {
+        'label': args.label or datetime.datetime.now().isoformat(timespec='seconds'),
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'config': {
+            'grid': list(grid_size),
+            'rows': args.rows,
+            'pois': args.pois,
+            'tile_density': args.tile_density,
+            'batch_size': args.batch_size,
+            'top_k': args.top_k,
+            'byte_budget': args.byte_budget,
+            'smoothing_radius': args.smoothing_radius,
+            'smoothing_sigma': args.smoothing_sigma,
+            'smoothing_self_weight': args.smoothing_self_weight,
+            'shards': list(args.shards),
+            'sessions': args.sessions,
+            'session_length': args.session_length,
+            'seed': args.seed
+        },
+        'results': perf.results()
+    }
+
+    for name, result in run['results'].items():
+        print("Benchmark: {:<22} | Min: {:.3e}s | Median: {:.3e}s | Max: {:.3e}s | Ops/s: {:.1f}".format(name, result['min_s'], result['median_s'], result['max_s'], result['ops_per_s']))
+
+    history = save_run(args.history, run)
+    print("Saved run '{}' @ '{}'".format(run['label'], args.history))
+
+    if args.compare:
+        baseline = find_baseline(history, history[-1], args.baseline)
+        if baseline is None:
+            print("No baseline run with the same fixture settings found, nothing was compared")
+            sys.exit(2)
+
+        for key, (base_value, value) in config_differences(baseline, run).items():
+            print("Config differs: {} | Baseline: {} | Now: {}".format(key, base_value, value))
+
+        comparison = compare_runs(baseline, run, args.threshold, args.one_shot_threshold)
+        regressions = [name for name, c in comparison.items() if c['status'] == 'regression']
+        for name, c in comparison.items():
+            if c['status'] == 'new':
+                print("Benchmark: {:<22} | not in baseline, not compared".format(name))
+            elif c['status'] == 'removed':
+                print("Benchmark: {:<22} | missing in this run, not compared".format(name))
+            else:
+                print("Benchmark: {:<22} | Baseline: {:.3e}s | Now: {:.3e}s | x{:.2f} | vs. slowest baseline repeat: x{:.2f}{}".format(
+                    name, c['baseline_s'], c['current_s'], c['ratio'], c['spread_ratio'], " REGRESSION" if c['status'] == 'regression' else ""))
+
+        if regressions:
+            print("Regressions against '{}': {}".format(baseline['label'], ", ".join(regressions)))
+            sys.exit(1)
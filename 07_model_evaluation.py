@@ -0,0 +1,80 @@
+from benchmark_classes.model import MultinomialNBClassifier
+from benchmark_classes.model_evaluation import ModelEvaluator, time_split
+from benchmark_classes.synthetic_fixtures import generate_access_df
+import argparse
+import json
+import time
+import pandas as pd
+
+features = {
+    'temp': [0, 1, 2, 3, 4],
+    'snow': [0, 1, 2, 3, 4],
+    'wspd': [0, 1, 2, 3, 4],
+    'coco': [0, 1, 2],
+    'vacation': [0, 1],
+    'holiday': [0, 1],
+    'month': [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12],
+    'weekday': [0, 1, 2, 3, 4, 5, 6],
+    'hour': [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23]
+}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Auswertung des Modells auf zurückgehaltenen Stunden der Zugriffsdaten")
+    parser.add_argument('--data', default='./data/synth_access_data.csv', help="Zugriffsdaten (CSV)")
+    parser.add_argument('--synthetic', type=int, nargs=2, default=None, metavar=('X', 'Y'), help="Synthetische Zugriffsdaten mit diesem Gitter statt der CSV verwenden")
+    parser.add_argument('--rows', type=int, default=8760, help="Anzahl der synthetischen Datensätze (Stunden)")
+    parser.add_argument('--model', default=None, help="Bereits trainiertes Modell auswerten, statt auf dem Trainingsanteil neu zu trainieren (darf nur auf dem Trainingsanteil trainiert worden sein, sonst sind die Werte nicht 'held-out')")
+    parser.add_argument('--test-fraction', type=float, default=0.2, help="Zeitlich letzter Anteil der Daten, der zurückgehalten wird")
+    parser.add_argument('--k', type=int, default=100, help="k für Precision@k und Recall@k")
+    parser.add_argument('--budget', type=int, default=None, help="Cache-Budget (Tiles) für die Hit-Rate (Standard: k)")
+    parser.add_argument('--output', default=None, help="Ergebnisse zusätzlich als JSON speichern")
+    args = parser.parse_args()
+
+    if not 0 < args.test_fraction < 1:
+        parser.error("--test-fraction must be between 0 and 1 (exclusive)")
+    if args.k < 1 or (args.budget is not None and args.budget < 1):
+        parser.error("--k and --budget must be at least 1")
+
+    return args
+
+
+def print_metrics(name, metrics):
+    print("{:<10} | Rows: {:>5} | P@k: {:.4f} | R@k: {:.4f} | Hit Rate@Budget: {:.4f} | LL/Request: {:.4f}".format(
+        name, metrics['rows'], metrics['precision_at_k'], metrics['recall_at_k'], metrics['hit_rate_at_budget'], metrics['log_likelihood']))
+
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    if args.synthetic:
+        grid_size = tuple(args.synthetic)
+        df = generate_access_df(args.rows, grid_size, features)
+    else:
+        df = pd.read_csv(args.data, index_col=0)
+        df = df.drop(columns=['index'], errors='ignore')
+        grid_size = (195, 104)
+
+    train_df, test_df = time_split(df, args.test_fraction)
+    print("Train rows: {} | Held-out rows: {}".format(len(train_df), len(test_df)))
+
+    if args.model:
+        model = MultinomialNBClassifier.load(args.model)
+        # z.B. data/model.pkl wurde auf der gesamten CSV trainiert und kennt die zurückgehaltenen Stunden bereits
+        print("Warning: '{}' is evaluated as given. Unless it was trained on the first {} rows only, the held-out rows were part of its training data and the metrics are optimistic".format(args.model, len(train_df)))
+    else:
+        model = MultinomialNBClassifier(train_df, (0, grid_size[0]), (0, grid_size[1]), features)
+
+    time_start = time.time()
+    evaluator = ModelEvaluator(model, features)
+    result = evaluator.evaluate(test_df, k=args.k, budget=args.budget)
+    print("Evaluated {} held-out rows in {:.2f}s".format(len(test_df), time.time() - time_start))
+
+    print_metrics('overall', result['overall'])
+    for breakdown in ['hour', 'month', 'coco']:
+        for value, metrics in result.get(breakdown, {}).items():
+            print_metrics("{}={}".format(breakdown, value), metrics)
+
+    if args.output:
+        with open(args.output, 'w') as fp:
+            json.dump(result, fp, indent=2)
+        print("Saved results @ '{}'".format(args.output))
@@ -2,14 +2,23 @@ import sys
 sys.path.append("./04_model_viewer")
 
 from model import MultinomialNBClassifier
+from benchmark_classes.spatial_smoothing import SpatialSmoother
 
 class BayesPrefetcher:
-    def __init__(self, model_path):
+    def __init__(self, model_path, smoothing: dict = None):
         self.__model = MultinomialNBClassifier.load(model_path)
+        self.__smoother = None
+
+        # optional: neighbouring tiles of hot tiles are scored up (see SpatialSmoother for options)
+        if smoothing is not None:
+            self.__smoother = SpatialSmoother(self.__model.predict({}).keys(), **smoothing)
 
 
     def choose_tiles(self, ext_factors, num_caches):
         predictions = self.__model.predict(ext_factors)
+        if self.__smoother is not None:
+            predictions = self.__smoother.smooth(predictions)
+
         predictions,_ = zip(*sorted(predictions.items(), key=lambda i: i[1], reverse=True))
 
         return predictions[:num_caches]
\ No newline at end of file
@@ -2,8 +2,11 @@ import random
 import collections
 
 class CacheHitrateBenchmark:
-    def __init__(self, data_classes: dict[str, list[int]]):
+    def __init__(self, data_classes: dict[str, list[int]], tile_sizes: dict[tuple[int, int], int] = None):
         self.__data_classes = data_classes
+        self.__tile_sizes = tile_sizes
+        self.__default_size = sum(tile_sizes.values()) / len(tile_sizes) if tile_sizes else 1
+        self.__min_size = min(tile_sizes.values()) if tile_sizes else 1
         self.__prefetch_caches = {}
 
 
@@ -11,25 +14,40 @@ class CacheHitrateBenchmark:
         self.__prefetch_caches[descriptor] = generate_priority_queue
 
 
-    def benchmark_random(self, hit_gen_func, n_random=100, n_reruns=50):
-        avg_hitrates = {}
+    def benchmark_random(self, hit_gen_func, n_random=100, n_reruns=50, return_byte_hitrate=False, equal_byte_budget=False):
+        # hit rates of all reruns of all random states, averaged once at the end
+        hit_rates = collections.defaultdict(list)
+        byte_hit_rates = collections.defaultdict(list)
 
         for i in range(n_random):
             factors = self._generate_random_state()
             hit_generator = hit_gen_func(factors)
-            hit_rates = collections.defaultdict(list)
             
             for j in range(n_reruns):
                 # get 50% of most requested tiles (tiles, that had at least 1 hit)
                 # ordered by request amount
                 requested = next(hit_generator)
                 prefetched_tiles = collections.defaultdict(list)
+
+                # with equal_byte_budget every cache gets the bytes of len(requested) average tiles instead of
+                # len(requested) tiles, and is asked for enough tiles to fill them with the smallest ones
+                n_prefetch = len(requested)
+                byte_budget = None
+                if equal_byte_budget:
+                    byte_budget = len(requested) * self.__default_size
+                    n_prefetch = int(byte_budget // self.__min_size)
                 local_hits = {}
+                local_hit_bytes = {}
 
                 for alg_name, alg_func in self.__prefetch_caches.items():
                     # get len(requested) most likely tiles
-                    prefetched_tiles[alg_name] = alg_func(factors, len(requested))
+                    # as a set, so the membership test below is O(1) per requested tile
+                    tiles = alg_func(factors, n_prefetch)
+                    if byte_budget is not None:
+                        tiles = self._within_budget(tiles, byte_budget)
+                    prefetched_tiles[alg_name] = set(tiles)
                     local_hits[alg_name] = 0
+                    local_hit_bytes[alg_name] = 0
 
                 for tile in requested:
                     for alg_name in self.__prefetch_caches.keys():
@@ -37,16 +55,66 @@ class CacheHitrateBenchmark:
                             continue
 
                         local_hits[alg_name] += 1
+                        local_hit_bytes[alg_name] += self._tile_size(tile)
 
+                requested_bytes = sum(self._tile_size(tile) for tile in requested)
                 for alg_name, amt_hits in local_hits.items():
                     hit_rates[alg_name].append(amt_hits / len(requested))
-            
-            for alg_name, l_hit_rates in hit_rates.items():
-                avg_hitrates[alg_name] = sum(l_hit_rates) / len(l_hit_rates)
-        
+                    byte_hit_rates[alg_name].append(local_hit_bytes[alg_name] / requested_bytes)
+
+        avg_hitrates = {}
+        avg_byte_hitrates = {}
+        for alg_name, l_hit_rates in hit_rates.items():
+            avg_hitrates[alg_name] = sum(l_hit_rates) / len(l_hit_rates)
+            avg_byte_hitrates[alg_name] = sum(byte_hit_rates[alg_name]) / len(byte_hit_rates[alg_name])
+
+        if return_byte_hitrate:
+            return avg_hitrates, avg_byte_hitrates
+
         return avg_hitrates
             
 
+    def benchmark_sequences(self, sequences, num_caches, factors=None):
+        # replays request traces: after each request the caches prefetch num_caches tiles,
+        # a hit is counted when the next requested tile was among them
+        hits = collections.defaultdict(int)
+        n_requests = 0
+
+        for sequence in sequences:
+            session_factors = factors or self._generate_random_state()
+
+            for tile, next_tile in zip(sequence, sequence[1:]):
+                n_requests += 1
+                for alg_name, alg_func in self.__prefetch_caches.items():
+                    if next_tile in set(alg_func(dict(session_factors, tile=tile), num_caches)):
+                        hits[alg_name] += 1
+
+        return {alg_name: hits[alg_name] / max(n_requests, 1) for alg_name in self.__prefetch_caches.keys()}
+
+
+    def _within_budget(self, tiles, byte_budget):
+        # tiles in priority order, tiles that no longer fit are skipped (as in CostAwarePrefetcher.plan)
+        chosen = []
+        used_bytes = 0
+        for tile in tiles:
+            size = self._tile_size(tile)
+            if used_bytes + size > byte_budget:
+                continue
+
+            chosen.append(tile)
+            used_bytes += size
+
+        return chosen
+
+
+    def _tile_size(self, tile):
+        # Without a size table every tile counts as one byte, so the byte hit rate equals the hit rate
+        if self.__tile_sizes is None:
+            return 1
+
+        return self.__tile_sizes.get(tile, self.__default_size)
+
+
     def _generate_random_state(self):
         random_state = {}
         
@@ -0,0 +1,74 @@
+import sys
+sys.path.append("./04_model_viewer")
+
+from model import MultinomialNBClassifier
+import pandas as pd
+
+def load_tile_sizes(path):
+    # CSV with one row per tile: tile_x, tile_y, bytes
+    size_df = pd.read_csv(path)
+    return {(int(x), int(y)): int(b) for x, y, b in zip(size_df['tile_x'], size_df['tile_y'], size_df['bytes'])}
+
+
+def save_tile_sizes(path, tile_sizes):
+    tiles, sizes = zip(*tile_sizes.items())
+    tile_xs, tile_ys = zip(*tiles)
+    pd.DataFrame({'tile_x': tile_xs, 'tile_y': tile_ys, 'bytes': sizes}).to_csv(path, index=False)
+
+
+class CostAwarePrefetcher:
+    def __init__(self, model_path, tile_sizes: dict[tuple[int, int], int], byte_budget=None):
+        self.__model = MultinomialNBClassifier.load(model_path)
+        self.__tile_sizes = tile_sizes
+        self.__default_size = sum(tile_sizes.values()) / len(tile_sizes)
+        self.__byte_budget = byte_budget
+
+
+    def tile_size(self, tile):
+        return self.__tile_sizes.get(tile, self.__default_size)
+
+
+    def plan(self, ext_factors, byte_budget):
+        predictions = self.__model.predict(ext_factors)
+        total = sum(predictions.values())
+
+        # Greedy knapsack: highest expected hits per byte first, tiles that no longer fit are skipped
+        ranked = sorted(predictions.items(), key=lambda i: i[1] / self.tile_size(i[0]), reverse=True)
+        min_size = min(self.tile_size(tile) for tile in predictions.keys())
+
+        chosen = []
+        used_bytes = 0
+        expected_hits = 0.0
+        expected_hit_bytes = 0.0
+
+        for tile, score in ranked:
+            size = self.tile_size(tile)
+            if used_bytes + size > byte_budget:
+                continue
+
+            chosen.append(tile)
+            used_bytes += size
+            expected_hits += score / total
+            expected_hit_bytes += score / total * size
+
+            if byte_budget - used_bytes < min_size:
+                break
+
+        # The best single tile bounds the greedy result to at least half of the optimum
+        fitting = [(tile, score) for tile, score in predictions.items() if self.tile_size(tile) <= byte_budget]
+        best_single = max(fitting, key=lambda i: i[1], default=None)
+        if best_single is not None and best_single[1] / total > expected_hits:
+            tile, score = best_single
+            return [tile], score / total * self.tile_size(tile)
+
+        return chosen, expected_hit_bytes
+
+
+    def choose_tiles(self, ext_factors, num_caches):
+        # Without a fixed budget the cache gets as many bytes as num_caches average tiles
+        byte_budget = self.__byte_budget
+        if byte_budget is None:
+            byte_budget = num_caches * self.__default_size
+
+        tiles, _ = self.plan(ext_factors, byte_budget)
+        return tiles
@@ -18,9 +18,13 @@ WHERE shop IS NOT NULL
 """
 
 class HitrateGenerator:
-    def __init__(self, engine_uri):
-        self.__engine = create_engine(engine_uri)
-        self.__poi_df = pd.read_sql(query, self.__engine)
+    def __init__(self, engine_uri=None, poi_df=None):
+        # Without a database a preloaded (e.g. synthetic) POI table can be passed in
+        if poi_df is None:
+            self.__engine = create_engine(engine_uri)
+            poi_df = pd.read_sql(query, self.__engine)
+
+        self.__poi_df = poi_df
 
         self.__poi_tiles = []
         for i, row in self.__poi_df.iterrows():
@@ -33,6 +37,10 @@ class HitrateGenerator:
             self.__poi_tiles.append((tx, ty))
 
 
+    def tile_poi_counts(self):
+        return collections.Counter(self.__poi_tiles)
+
+
     def _hit_generator(self, tile_visit_rates):
         while True:
             tile_hits = {}
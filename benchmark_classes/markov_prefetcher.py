@@ -0,0 +1,160 @@
+import sys
+sys.path.append("./04_model_viewer")
+
+from model import MultinomialNBClassifier
+import collections
+import heapq
+
+import numpy as np
+
+# context keys that describe the client session, not the external factors the Bayes model was trained on
+SESSION_KEYS = ('tile', 'session')
+
+class MarkovPrefetcher:
+    def __init__(self, sequences: list[list[tuple[int, int]]], neighbour_radius=1, bayes_model_path=None, blend=0.0, candidate_factor=1, context_cache_size=1024):
+        transitions = collections.defaultdict(collections.Counter)
+        popularity = collections.Counter()
+
+        # sparse tile->tile transition counts, re-requests of the same tile are not transitions
+        for sequence in sequences:
+            popularity.update(sequence)
+            for tile, next_tile in zip(sequence, sequence[1:]):
+                if tile != next_tile:
+                    transitions[tile][next_tile] += 1
+
+        # successors are ranked once, so a lookup is a slice of a precomputed list
+        self.__successors = {}
+        self.__successor_probs = {}
+        for tile, counter in transitions.items():
+            total = sum(counter.values())
+            self.__successors[tile] = [next_tile for next_tile, _ in counter.most_common()]
+            self.__successor_probs[tile] = {next_tile: count / total for next_tile, count in counter.items()}
+
+        self.__popular = [tile for tile, _ in popularity.most_common()]
+        total = sum(popularity.values())
+        self.__popular_probs = {tile: count / total for tile, count in popularity.items()}
+
+        # without any training sequence there is no grid to take neighbours from
+        self.__bounds = None
+        if popularity:
+            tile_xs, tile_ys = zip(*popularity.keys())
+            self.__bounds = (min(tile_xs), max(tile_xs), min(tile_ys), max(tile_ys))
+
+        # neighbour offsets ordered by distance, closest ring first
+        offsets = [(dx, dy) for dx in range(-neighbour_radius, neighbour_radius + 1) for dy in range(-neighbour_radius, neighbour_radius + 1) if dx or dy]
+        self.__neighbour_offsets = sorted(offsets, key=lambda o: (max(abs(o[0]), abs(o[1])), abs(o[0]) + abs(o[1])))
+
+        self.__score_table = None
+        self.__blend = blend
+        self.__candidate_factor = candidate_factor
+        if bayes_model_path is not None and blend > 0:
+            self.__score_table = MultinomialNBClassifier.load(bayes_model_path).score_table()
+
+        # normalised Bayes scores per context, external factors repeat far more often than tiles change
+        self.__context_cache = collections.OrderedDict()
+        self.__context_cache_size = context_cache_size
+
+        self.__last_tiles = {}
+
+
+    def observe(self, session, tile):
+        # remember the tile a client session just loaded, used when ext_factors carries no 'tile'
+        self.__last_tiles[session] = tile
+
+
+    def end_session(self, session):
+        self.__last_tiles.pop(session, None)
+
+
+    def _neighbours(self, tile):
+        if self.__bounds is None:
+            return
+
+        min_x, max_x, min_y, max_y = self.__bounds
+        for dx, dy in self.__neighbour_offsets:
+            neighbour = (tile[0] + dx, tile[1] + dy)
+            if min_x <= neighbour[0] <= max_x and min_y <= neighbour[1] <= max_y:
+                yield neighbour
+
+
+    def _candidates(self, tile, num_caches):
+        # learned successors first, then spatial neighbours, then globally popular tiles
+        chosen = []
+        seen = set()
+        sources = [self.__successors.get(tile, []), self._neighbours(tile), self.__popular] if tile is not None else [self.__popular]
+
+        for source in sources:
+            for candidate in source:
+                if len(chosen) == num_caches:
+                    return chosen
+                if candidate in seen or candidate == tile:
+                    continue
+
+                chosen.append(candidate)
+                seen.add(candidate)
+
+        return chosen
+
+
+    def _context_scores(self, ext_factors):
+        context = tuple(sorted((dc_name, value) for dc_name, value in ext_factors.items() if dc_name not in SESSION_KEYS))
+        if context in self.__context_cache:
+            self.__context_cache.move_to_end(context)
+            return self.__context_cache[context]
+
+        # softmax over the log scores, equal to the normalised output of predict
+        scores = self.__score_table.score(dict(context))
+        probs = np.exp(scores - scores.max())
+        probs /= probs.sum()
+        entry = dict(zip(self.__score_table.tiles(), probs.tolist()))
+
+        self.__context_cache[context] = entry
+        if len(self.__context_cache) > self.__context_cache_size:
+            self.__context_cache.popitem(last=False)
+
+        return entry
+
+
+    def _transition_probs(self, tile):
+        # same fallback order as _candidates: successors, then uniform neighbours, then popularity
+        if tile is None:
+            return self.__popular_probs
+        if tile in self.__successor_probs:
+            return self.__successor_probs[tile]
+
+        neighbours = list(self._neighbours(tile))
+        if neighbours:
+            return dict.fromkeys(neighbours, 1 / len(neighbours))
+
+        return self.__popular_probs
+
+
+    def _blended(self, ext_factors, tile, num_caches):
+        # The Bayes distribution over all tiles is very peaked, mixed in directly a few globally hot tiles
+        # push out the learned successors. It is therefore renormalised over the Markov candidates and
+        # only re-ranks them: (1-blend) * P(next tile | tile) + blend * P(candidate | context, candidates).
+        # candidate_factor > 1 lets the context pull in Markov candidates beyond the first num_caches
+        bayes_probs = self._context_scores(ext_factors)
+        transition_probs = self._transition_probs(tile)
+        candidates = self._candidates(tile, self.__candidate_factor * num_caches)
+        if not candidates:
+            # nothing learned from sequences, the context alone decides
+            return heapq.nlargest(num_caches, bayes_probs, key=bayes_probs.get)
+
+        bayes_total = sum(bayes_probs.get(candidate, 0) for candidate in candidates) or 1
+        scores = {
+            candidate: (1 - self.__blend) * transition_probs.get(candidate, 0) + self.__blend * bayes_probs.get(candidate, 0) / bayes_total
+            for candidate in candidates
+        }
+
+        return heapq.nlargest(num_caches, candidates, key=scores.get)
+
+
+    def choose_tiles(self, ext_factors, num_caches):
+        # without an explicit 'tile' the last observed tile of the request's session is used
+        tile = ext_factors['tile'] if 'tile' in ext_factors else self.__last_tiles.get(ext_factors.get('session'))
+
+        if self.__score_table is not None:
+            return self._blended(ext_factors, tile, num_caches)
+
+        return self._candidates(tile, num_caches)
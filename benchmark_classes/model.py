@@ -1,5 +1,6 @@
 import collections
 import math
+import numpy as np
 import pandas as pd
 import pickle
 import os
@@ -27,6 +28,8 @@ class MultinomialNBClassifier:
 
         # Zahl der Tile-Zugriffe + Laplace Glättung
         tile_access_count_total = math.log(df[df_tiles].sum().sum() + (tile_x_range[1]-tile_x_range[0]) * (tile_y_range[1]-tile_y_range[0]))*df_len
+        # Wird z.B. benötigt, um Log-Werte mehrerer Modelle (Regionen-Shards) vergleichbar zu machen
+        self.prior_normaliser = tile_access_count_total
         for tile in self.__priors.keys():
             self.__priors[tile] -= tile_access_count_total
             if self.__priors[tile] > 0:
@@ -62,17 +65,26 @@ class MultinomialNBClassifier:
         with open(path, 'rb') as fp:
             return pickle.load(fp)
 
-    def predict(self, data: dict[str, int]):
+    def score_table(self):
+        # Vektorisierte Form von predict(..., return_log=True), z.B. für viele Anfragen oder Regionen-Shards
+        return TileScoreTable(self.__priors, self.__likelihoods)
+
+    def predict(self, data: dict[str, int], return_log=False):
         probabilities = {}
 
         for tile, P_tile in self.__priors.items():
             P_tile_given_c = P_tile
             for cpair in data.items():
                 # P(tile)P(data|tile) = log(P(tile))+log(P(data|tile))
-                P_tile_given_c += self.__likelihoods[(tile, cpair)]
+                # Unbekannte Faktoren (z.B. 'day' oder 'tile') zählen nicht und legen keine neuen Einträge an
+                P_tile_given_c += self.__likelihoods.get((tile, cpair), 0)
             
             probabilities[tile] = P_tile_given_c
 
+        # Unnormalisierte Log-Werte, z.B. um Vorhersagen mehrerer Modelle zu vergleichen
+        if return_log:
+            return probabilities
+
         # Normalisieren der Wahrscheinlichkeiten für Darstellung auf der interaktiven Karte 
         max_p = max(probabilities.values())
         for pk in probabilities.keys():
@@ -82,6 +94,50 @@ class MultinomialNBClassifier:
         return probabilities
 
 
+class TileScoreTable:
+    def __init__(self, priors: dict, likelihoods: dict):
+        self.__tiles = list(priors.keys())
+        tile_index = {tile: i for i, tile in enumerate(self.__tiles)}
+        self.__priors = np.array([priors[tile] for tile in self.__tiles])
+
+        # Eine Zeile Log-Likelihoods je (Klasse, Wert); Zeile 0 steht für unbekannte Werte und zählt wie in predict nicht
+        self.__option_rows = {}
+        rows = [np.zeros(len(self.__tiles))]
+        for (tile, cpair), P_c_given_tile in likelihoods.items():
+            if cpair not in self.__option_rows:
+                self.__option_rows[cpair] = len(rows)
+                rows.append(np.zeros(len(self.__tiles)))
+            rows[self.__option_rows[cpair]][tile_index[tile]] = P_c_given_tile
+
+        self.__likelihoods = np.vstack(rows)
+        self.__class_names = {dc_name for dc_name, _ in self.__option_rows.keys()}
+
+    def tiles(self):
+        return self.__tiles
+
+    def score(self, data: dict[str, int]):
+        # Log-Werte in der Reihenfolge von tiles(), gleich predict(data, return_log=True)
+        scores = self.__priors.copy()
+        for cpair in data.items():
+            row = self.__option_rows.get(cpair)
+            if row is not None:
+                scores += self.__likelihoods[row]
+
+        return scores
+
+    def score_rows(self, df: pd.DataFrame):
+        # Eine Zeile Log-Werte je Datensatz, alle Datensätze in einer Matrixrechnung
+        scores = np.tile(self.__priors, (len(df), 1))
+        for dc_name in self.__class_names:
+            if dc_name not in df.columns:
+                continue
+
+            row_idx = np.array([self.__option_rows.get((dc_name, value), 0) for value in df[dc_name].tolist()], dtype=int)
+            scores += self.__likelihoods[row_idx]
+
+        return scores
+
+
 # Wird dieses Skript direkt aufgerufen, wird das Modell zwischengespeichert
 if __name__ == '__main__':
     MODEL_PATH = './data/model.pkl'
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+def time_split(df, test_fraction=0.2):
+    # rows are consecutive hours, so the last rows are held out instead of a random sample
+    n_train = int(len(df) * (1 - test_fraction))
+    return df.iloc[:n_train], df.iloc[n_train:]
+
+
+class ModelEvaluator:
+    def __init__(self, model, data_classes: dict[str, list]):
+        self.__table = model.score_table()
+        self.__tiles = self.__table.tiles()
+        self.__data_classes = data_classes
+        self.__tile_ids = [";".join([str(tile[0]), str(tile[1])]) for tile in self.__tiles]
+
+
+    def tiles(self):
+        return self.__tiles
+
+
+    def score(self, df):
+        # log P(tile) + sum of log P(c|tile) for every row at once, equal to predict(..., return_log=True)
+        return self.__table.score_rows(df[[dc_name for dc_name in self.__data_classes.keys() if dc_name in df.columns]])
+
+
+    def _targets(self, df):
+        # observed access counts, aligned with the model's tile order
+        return df.reindex(columns=self.__tile_ids, fill_value=0).to_numpy(dtype=float)
+
+
+    def _row_metrics(self, scores, targets, k, budget):
+        log_probs = scores - scores.max(axis=1, keepdims=True)
+        log_probs -= np.log(np.exp(log_probs).sum(axis=1, keepdims=True))
+
+        top_k = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_budget = np.argpartition(-scores, budget - 1, axis=1)[:, :budget]
+        accessed = targets > 0
+
+        return pd.DataFrame({
+            'n_accessed': accessed.sum(axis=1),
+            'n_relevant_top_k': np.take_along_axis(accessed, top_k, axis=1).sum(axis=1),
+            'requests': targets.sum(axis=1),
+            'budget_hits': np.take_along_axis(targets, top_budget, axis=1).sum(axis=1),
+            'log_likelihood': (targets * log_probs).sum(axis=1)
+        })
+
+
+    def evaluate(self, df, k=100, budget=None, breakdowns=('hour', 'month', 'coco'), chunk_size=512):
+        if k < 1 or (budget is not None and budget < 1):
+            raise ValueError("k and budget must be at least 1, received k={} and budget={}".format(k, budget))
+
+        k = min(k, len(self.__tiles))
+        budget = min(budget or k, len(self.__tiles))
+        df = df.reset_index(drop=True)
+
+        # rows are scored in chunks so the rows x tiles matrix stays small for a full year
+        row_metrics = []
+        for start in range(0, len(df), chunk_size):
+            chunk = df.iloc[start:start+chunk_size]
+            row_metrics.append(self._row_metrics(self.score(chunk), self._targets(chunk), k, budget))
+        # an empty held-out frame gives rows: 0 and NaN metrics
+        if not row_metrics:
+            row_metrics.append(self._row_metrics(self.score(df), self._targets(df), k, budget))
+        row_metrics = pd.concat(row_metrics, ignore_index=True)
+
+        result = {'overall': self._summarise(row_metrics, k)}
+        for dc_name in breakdowns:
+            if dc_name not in df.columns:
+                continue
+
+            result[dc_name] = {
+                value.item() if hasattr(value, 'item') else value: self._summarise(group, k)
+                for value, group in row_metrics.groupby(df[dc_name])
+            }
+
+        return result
+
+
+    def _summarise(self, row_metrics, k):
+        with_access = row_metrics[row_metrics['n_accessed'] > 0]
+        requests = row_metrics['requests'].sum()
+
+        return {
+            'rows': len(row_metrics),
+            'precision_at_k': (with_access['n_relevant_top_k'] / k).mean() if len(with_access) else float('nan'),
+            'recall_at_k': (with_access['n_relevant_top_k'] / with_access['n_accessed']).mean() if len(with_access) else float('nan'),
+            'hit_rate_at_budget': row_metrics['budget_hits'].sum() / requests if requests else float('nan'),
+            'log_likelihood': row_metrics['log_likelihood'].sum() / requests if requests else float('nan')
+        }
@@ -0,0 +1,182 @@
+import json
+import os
+import random
+import statistics
+import timeit
+
+import numpy as np
+import pandas as pd
+
+# Only these settings shape the synthetic fixtures; runs that agree on them are comparable
+FIXTURE_KEYS = ['grid', 'rows', 'pois', 'tile_density', 'seed']
+
+
+def _calibration_workload():
+    # interpreter, numpy and pandas work, like the mix of the measured benchmarks
+    total = sum(i * i for i in range(5000))
+    values = np.arange(50000) % 97
+    total += int(np.argpartition(-np.sqrt(values * 1.5), 100)[0])
+    total += int(pd.Series(values).groupby(values % 7).sum().iloc[0])
+    return total
+
+
+class PerformanceBenchmark:
+    def __init__(self, repeats=7, one_shot_repeats=3, seed=None):
+        self.__repeats = repeats
+        self.__one_shot_repeats = one_shot_repeats
+        self.__seed = seed
+        self.__pending = {'calibration': (_calibration_workload, 1)}
+        self.__results = {}
+
+
+    def _reseed(self):
+        # every repeat sees the same random draws, so stochastic workloads stay comparable
+        if self.__seed is not None:
+            random.seed(self.__seed)
+            np.random.seed(self.__seed)
+
+
+    def _store(self, name, timings, number, n_ops, one_shot):
+        # seconds per single operation, so batch sizes can change without breaking comparisons
+        median = statistics.median(timings) / n_ops
+        self.__results[name] = {
+            'median_s': median,
+            'min_s': min(timings) / n_ops,
+            'max_s': max(timings) / n_ops,
+            'ops_per_s': 1 / median if median > 0 else float('inf'),
+            'repeats': len(timings),
+            'number': number,
+            'n_ops': n_ops,
+            'one_shot': one_shot
+        }
+
+        return self.__results[name]
+
+
+    def measure(self, name, func, n_ops=1, one_shot=False):
+        # immediate measurement, for expensive one-shot steps (training) whose result is needed right away
+        timer = timeit.Timer(func)
+        repeats = self.__one_shot_repeats if one_shot else self.__repeats
+        number = 1 if one_shot else self._autorange(timer)
+
+        timings = []
+        for i in range(repeats):
+            self._reseed()
+            timings.append(timer.timeit(number) / number)
+
+        return self._store(name, timings, number, n_ops, one_shot)
+
+
+    def add(self, name, func, n_ops=1):
+        # deferred measurement, executed interleaved with all other added benchmarks by run()
+        self.__pending[name] = (func, n_ops)
+
+
+    def _autorange(self, timer):
+        # timeit-style inner loop of at least 0.2s per repeat, so microsecond operations are measurable
+        self._reseed()
+        number, _ = timer.autorange()
+        return number
+
+
+    def run(self):
+        timers = {name: timeit.Timer(func) for name, (func, n_ops) in self.__pending.items()}
+        numbers = {name: self._autorange(timer) for name, timer in timers.items()}
+        timings = {name: [] for name in timers.keys()}
+
+        # repeats run round-robin, so a short burst of machine noise cannot hit every repeat of one benchmark
+        for i in range(self.__repeats):
+            for name, timer in timers.items():
+                self._reseed()
+                timings[name].append(timer.timeit(numbers[name]) / numbers[name])
+
+        for name, (func, n_ops) in self.__pending.items():
+            self._store(name, timings[name], numbers[name], n_ops, False)
+        self.__pending = {}
+
+        return self.__results
+
+
+    def results(self):
+        return self.__results
+
+
+def load_history(path):
+    if not os.path.isfile(path):
+        return []
+
+    with open(path, 'r') as fp:
+        return json.load(fp)
+
+
+def save_run(path, run):
+    history = load_history(path)
+    history.append(run)
+
+    with open(path, 'w') as fp:
+        json.dump(history, fp, indent=2)
+
+    return history
+
+
+def fixture_config(run):
+    return {key: run['config'].get(key) for key in FIXTURE_KEYS}
+
+
+def config_differences(baseline, current):
+    keys = sorted(set(baseline['config']) | set(current['config']))
+    return {
+        key: (baseline['config'].get(key), current['config'].get(key))
+        for key in keys
+        if baseline['config'].get(key) != current['config'].get(key)
+    }
+
+
+def find_baseline(history, current, baseline_label=None):
+    # Without an explicit label the latest earlier run with identical fixture settings is used
+    for run in reversed(history):
+        if run is current:
+            continue
+        if baseline_label is not None:
+            if run['label'] == baseline_label:
+                return run
+        elif fixture_config(run) == fixture_config(current):
+            return run
+
+    return None
+
+
+def compare_runs(baseline, current, threshold=0.15, one_shot_threshold=0.5):
+    # Both runs are scaled by their calibration workload, so a generally slower or busier machine is not
+    # a regression; a faster calibration is not held against the current run. A benchmark only counts as
+    # slower when even its fastest repeat is slower than the slowest repeat of the baseline, so the noise
+    # between repeats is never reported as a regression
+    comparison = {}
+    speed = 1.0
+    if 'calibration' in baseline['results'] and 'calibration' in current['results']:
+        speed = max(1.0, current['results']['calibration']['min_s'] / max(baseline['results']['calibration']['min_s'], 1e-12))
+
+    for name, result in current['results'].items():
+        if name == 'calibration':
+            continue
+        if name not in baseline['results']:
+            comparison[name] = {'status': 'new', 'current_s': result['min_s']}
+            continue
+
+        base = baseline['results'][name]
+        ratio = result['min_s'] / max(base['min_s'], 1e-12) / speed
+        spread_ratio = result['min_s'] / max(base.get('max_s', base['median_s']), 1e-12) / speed
+        allowed = one_shot_threshold if result.get('one_shot') else threshold
+        comparison[name] = {
+            'status': 'regression' if spread_ratio > 1 + allowed else 'ok',
+            'baseline_s': base['min_s'],
+            'current_s': result['min_s'],
+            'ratio': ratio,
+            'spread_ratio': spread_ratio
+        }
+
+    for name in baseline['results'].keys():
+        if name not in current['results'] and name != 'calibration':
+            comparison[name] = {'status': 'removed', 'baseline_s': baseline['results'][name]['min_s']}
+
+    return comparison
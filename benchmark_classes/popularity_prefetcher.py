@@ -0,0 +1,73 @@
+import numpy as np
+
+def _tile_columns(access_df):
+    # tile columns are named "<tile_x>;<tile_y>", as in synth_access_data.csv
+    return [c for c in access_df.columns if ';' in str(c)]
+
+
+def _parse_tiles(tile_columns):
+    return [tuple(int(p) for p in t_id.split(';')) for t_id in tile_columns]
+
+
+class PopularityPrefetcher:
+    def __init__(self, access_df):
+        tile_columns = _tile_columns(access_df)
+        tiles = _parse_tiles(tile_columns)
+        counts = access_df[tile_columns].to_numpy().sum(axis=0)
+
+        # static LFU: tiles ranked once by their total access count
+        self.__ranked = [tiles[i] for i in np.argsort(-counts, kind='stable')]
+
+
+    def choose_tiles(self, ext_factors, num_caches):
+        return self.__ranked[:num_caches]
+
+
+class ContextPopularityPrefetcher:
+    def __init__(self, access_df, context_classes=('hour',)):
+        self.__context_classes = list(context_classes)
+        self.__fallback = PopularityPrefetcher(access_df)
+
+        tile_columns = _tile_columns(access_df)
+        tiles = _parse_tiles(tile_columns)
+        counts = access_df.groupby(self.__context_classes)[tile_columns].sum()
+        orders = np.argsort(-counts.to_numpy(), axis=1, kind='stable')
+
+        # one ranked tile list per context value (e.g. per hour of day or per (weekday, hour))
+        self.__ranked = {}
+        for key, order in zip(counts.index, orders):
+            if not isinstance(key, tuple):
+                key = (key,)
+            self.__ranked[key] = [tiles[i] for i in order]
+
+
+    def choose_tiles(self, ext_factors, num_caches):
+        key = tuple(ext_factors.get(dc_name) for dc_name in self.__context_classes)
+        if key not in self.__ranked:
+            return self.__fallback.choose_tiles(ext_factors, num_caches)
+
+        return self.__ranked[key][:num_caches]
+
+
+class WeightedRandomPrefetcher:
+    def __init__(self, access_df, n_orderings=100, seed=None):
+        tile_columns = _tile_columns(access_df)
+        self.__tiles = _parse_tiles(tile_columns)
+        counts = access_df[tile_columns].to_numpy().sum(axis=0).astype(float)
+
+        # Efraimidis-Spirakis: sorting by log(u)/w gives a weighted sample without replacement,
+        # several orderings are drawn up front so choose_tiles only has to slice one of them
+        rng = np.random.default_rng(seed)
+        log_u = np.log(rng.uniform(size=(n_orderings, len(self.__tiles))))
+        with np.errstate(divide='ignore'):
+            keys = np.where(counts > 0, log_u / counts, -np.inf)
+
+        self.__orderings = np.argsort(-keys, axis=1, kind='stable')
+        self.__next_ordering = 0
+
+
+    def choose_tiles(self, ext_factors, num_caches):
+        ordering = self.__orderings[self.__next_ordering]
+        self.__next_ordering = (self.__next_ordering + 1) % len(self.__orderings)
+
+        return [self.__tiles[i] for i in ordering[:num_caches]]
@@ -6,11 +6,5 @@ class RandomPrefetcher:
 
 
     def choose_tiles(self, ext_factors, num_caches):
-        all_tiles = self.__all_tiles.copy()
-        prefetched = []
-
-        for i in range(num_caches):
-            random_idx = random.randint(0, len(all_tiles)-1)
-            prefetched.append(all_tiles.pop(random_idx))
-        
-        return prefetched
\ No newline at end of file
+        # sampling without replacement, O(num_caches) instead of copying and popping from the tile list
+        return random.sample(self.__all_tiles, min(num_caches, len(self.__all_tiles)))
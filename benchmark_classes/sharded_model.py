@@ -0,0 +1,156 @@
+import sys
+sys.path.append("./04_model_viewer")
+
+from model import MultinomialNBClassifier
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import heapq
+import json
+import os
+
+import numpy as np
+
+SHARD_INDEX = 'shards.json'
+
+# Only set inside process pool workers, filled by the initializer of the pool that owns the worker
+_worker_shards = None
+
+
+def grid_regions(tile_x_range, tile_y_range, n_x, n_y):
+    # every region needs at least one tile column and row, an empty shard cannot be trained
+    width, height = tile_x_range[1] - tile_x_range[0], tile_y_range[1] - tile_y_range[0]
+    if not 1 <= n_x <= width or not 1 <= n_y <= height:
+        raise ValueError("Cannot split a {}x{} grid into {}x{} regions".format(width, height, n_x, n_y))
+
+    regions = {}
+    x_bounds = [tile_x_range[0] + (tile_x_range[1] - tile_x_range[0]) * i // n_x for i in range(n_x + 1)]
+    y_bounds = [tile_y_range[0] + (tile_y_range[1] - tile_y_range[0]) * j // n_y for j in range(n_y + 1)]
+
+    for i in range(n_x):
+        for j in range(n_y):
+            regions['region_{}_{}'.format(i, j)] = ((x_bounds[i], x_bounds[i+1]), (y_bounds[j], y_bounds[j+1]))
+
+    return regions
+
+
+def train_shards(df, regions: dict[str, tuple[tuple[int, int], tuple[int, int]]], data_classes: dict[str, list]):
+    shards = {}
+    tile_columns = [c for c in df.columns if ';' in str(c)]
+
+    for name, (tile_x_range, tile_y_range) in regions.items():
+        shard_columns = []
+        for t_id in tile_columns:
+            tile_x, tile_y = (int(p) for p in t_id.split(';'))
+            if tile_x_range[0] <= tile_x < tile_x_range[1] and tile_y_range[0] <= tile_y < tile_y_range[1]:
+                shard_columns.append(t_id)
+
+        shard_df = df[list(data_classes.keys()) + shard_columns]
+        model = MultinomialNBClassifier(shard_df, tile_x_range, tile_y_range, data_classes)
+
+        # Each shard normalises its priors by its own access total, adding that term back
+        # puts the log scores of all shards on a common scale
+        shards[name] = {
+            'model': model,
+            'tile_x_range': list(tile_x_range),
+            'tile_y_range': list(tile_y_range),
+            'offset': model.prior_normaliser
+        }
+
+    return shards
+
+
+def save_shards(shard_dir, shards):
+    os.makedirs(shard_dir, exist_ok=True)
+    index = {}
+
+    for name, shard in shards.items():
+        model_file = '{}.pkl'.format(name)
+        shard['model'].save(os.path.join(shard_dir, model_file))
+        index[name] = {
+            'model_file': model_file,
+            'tile_x_range': shard['tile_x_range'],
+            'tile_y_range': shard['tile_y_range'],
+            'offset': shard['offset']
+        }
+
+    with open(os.path.join(shard_dir, SHARD_INDEX), 'w') as fp:
+        json.dump(index, fp, indent=2)
+
+
+def _load_shards(shard_dir, index):
+    shards = {}
+    for name, shard in index.items():
+        table = MultinomialNBClassifier.load(os.path.join(shard_dir, shard['model_file'])).score_table()
+        shards[name] = (table, np.array(table.tiles()), shard['offset'])
+
+    return shards
+
+
+def _shard_top_k(shard, ext_factors, k):
+    # vectorised scoring and top-k selection; numpy releases the GIL, so threads score shards in parallel
+    table, tiles, offset = shard
+    scores = table.score(ext_factors) + offset
+    k = min(k, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+
+    return [(scores[i], tuple(tiles[i].tolist())) for i in top]
+
+
+def _init_worker(shard_dir, index):
+    global _worker_shards
+    _worker_shards = _load_shards(shard_dir, index)
+
+
+def _worker_top_k(name, ext_factors, k):
+    return _shard_top_k(_worker_shards[name], ext_factors, k)
+
+
+class ShardRouter:
+    def __init__(self, shard_dir, max_workers=None, use_processes=False):
+        with open(os.path.join(shard_dir, SHARD_INDEX), 'r') as fp:
+            self.__index = json.load(fp)
+
+        # shards are loaded per router (or per worker of its own pool), so a router built
+        # after retraining always serves the shards currently saved in shard_dir
+        self.__use_processes = use_processes
+        if use_processes:
+            self.__shards = None
+            self.__executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(shard_dir, self.__index))
+        else:
+            self.__shards = _load_shards(shard_dir, self.__index)
+            self.__executor = ThreadPoolExecutor(max_workers=max_workers)
+
+
+    def route(self, tile_x_range=None, tile_y_range=None):
+        # without a query window every shard is relevant
+        shard_names = []
+
+        for name, shard in self.__index.items():
+            if tile_x_range is not None and (shard['tile_x_range'][1] <= tile_x_range[0] or tile_x_range[1] <= shard['tile_x_range'][0]):
+                continue
+            if tile_y_range is not None and (shard['tile_y_range'][1] <= tile_y_range[0] or tile_y_range[1] <= shard['tile_y_range'][0]):
+                continue
+
+            shard_names.append(name)
+
+        return shard_names
+
+
+    def top_k(self, ext_factors, k, tile_x_range=None, tile_y_range=None):
+        futures = []
+        for name in self.route(tile_x_range, tile_y_range):
+            if self.__use_processes:
+                futures.append(self.__executor.submit(_worker_top_k, name, ext_factors, k))
+            else:
+                futures.append(self.__executor.submit(_shard_top_k, self.__shards[name], ext_factors, k))
+
+        # every shard returns its own top-k, the global top-k is the top-k over their union
+        merged = heapq.nlargest(k, (entry for future in futures for entry in future.result()))
+        return [(tile, score) for score, tile in merged]
+
+
+    def choose_tiles(self, ext_factors, num_caches):
+        return [tile for tile, _ in self.top_k(ext_factors, num_caches)]
+
+
+    def close(self):
+        self.__executor.shutdown()
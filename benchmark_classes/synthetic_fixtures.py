@@ -0,0 +1,187 @@
+import numpy as np
+import pandas as pd
+import shapely as shp
+
+from benchmark_classes.hitrate_generator import MIN_X_COORD, MIN_Y_COORD
+
+TILE_SIZE = 0.01
+
+POI_COLUMNS = ['geom', 'aeroway', 'amenity', 'building', 'capacity', 'isced_level', 'leisure', 'name', 'opening_hours', 'shop', 'tourism']
+
+OUTDOOR_LEISURE = ['park', 'playground', 'garden', 'swimming_pool', 'picnic_table']
+INDOOR_LEISURE = ['fitness_centre', 'sports_centre', 'bowling_alley']
+SHOPS = ['convenience', 'supermarket', 'clothes', 'bakery', 'mall']
+TOURISM = ['hotel', 'museum', 'attraction', 'viewpoint']
+
+
+def generate_poi_df(n_pois, grid_size, n_clusters=8, seed=0):
+    # POIs are placed around a few "city centres" to mimic the spatial clustering of the real data
+    rng = np.random.default_rng(seed)
+    grid_x, grid_y = grid_size
+
+    centres = rng.uniform([0, 0], [grid_x, grid_y], size=(n_clusters, 2))
+    spread = max(1.0, min(grid_x, grid_y) / 10)
+    cluster_ids = rng.integers(0, n_clusters, size=n_pois)
+    positions = centres[cluster_ids] + rng.normal(0, spread, size=(n_pois, 2))
+    positions[:, 0] = positions[:, 0].clip(0, grid_x - 1e-3)
+    positions[:, 1] = positions[:, 1].clip(0, grid_y - 1e-3)
+
+    lons = MIN_X_COORD + positions[:, 0] * TILE_SIZE
+    lats = MIN_Y_COORD + positions[:, 1] * TILE_SIZE
+    geoms = shp.to_wkb(shp.points(lons, lats))
+
+    categories = rng.choice(['educational', 'leisure', 'commercial', 'tourism', 'other'], size=n_pois, p=[0.1, 0.2, 0.45, 0.15, 0.1])
+    rows = []
+    for i, category in enumerate(categories):
+        row = dict.fromkeys(POI_COLUMNS)
+        row['geom'] = geoms[i]
+        row['name'] = 'poi_{}'.format(i)
+
+        if category == 'educational':
+            row['amenity'] = 'school'
+            row['isced_level'] = str(rng.integers(1, 4))
+        elif category == 'leisure':
+            row['leisure'] = str(rng.choice(OUTDOOR_LEISURE + INDOOR_LEISURE))
+        elif category == 'commercial':
+            row['shop'] = str(rng.choice(SHOPS))
+        elif category == 'tourism':
+            row['tourism'] = str(rng.choice(TOURISM))
+        else:
+            row['amenity'] = 'toilets'
+
+        rows.append(row)
+
+    # object dtype keeps missing values as None, like pd.read_sql does
+    return pd.DataFrame(rows, columns=POI_COLUMNS, dtype=object)
+
+
+def _poi_tile_counts(grid_size, poi_df, mask=None):
+    grid_x, grid_y = grid_size
+    geoms = poi_df['geom'].to_numpy() if mask is None else poi_df['geom'].to_numpy()[mask]
+
+    coords = shp.get_coordinates(shp.from_wkb(geoms))
+    tile_xs = ((coords[:, 0] - MIN_X_COORD) / TILE_SIZE).astype(int).clip(0, grid_x - 1)
+    tile_ys = ((coords[:, 1] - MIN_Y_COORD) / TILE_SIZE).astype(int).clip(0, grid_y - 1)
+    poi_counts = np.zeros((grid_x, grid_y), dtype=int)
+    np.add.at(poi_counts, (tile_xs, tile_ys), 1)
+
+    return poi_counts
+
+
+def _category_profiles(columns, n_rows):
+    # Simplified, vectorised versions of the POI rate functions in hitrate_generator.py
+    zeros = np.zeros(n_rows, dtype=int)
+    hour, weekday, month = columns.get('hour', zeros), columns.get('weekday', zeros), columns.get('month', zeros)
+    free_day = (weekday > 5) | (columns.get('vacation', zeros) == 1) | (columns.get('holiday', zeros) == 1)
+
+    return {
+        'educational': np.where(free_day, 0.0, 2.0 + 20.0 * ((7 <= hour) & (hour <= 9))),
+        'leisure': 4.0 + 10.0 * ((free_day & (10 <= hour) & (hour <= 21)) | ((12 <= hour) & (hour <= 14)) | ((17 <= hour) & (hour <= 21))),
+        'commercial': np.where(weekday == 6, 17.0, 2.0 + 10.0 * ((17 <= hour) & (hour <= 19))),
+        'tourism': np.where((6 <= month) & (month <= 8), 22.0, 7.0),
+        'other': np.full(n_rows, 0.1)
+    }
+
+
+def generate_access_df(n_rows, grid_size, data_classes, tile_density=0.3, poi_df=None, rate_scale=0.05, seed=0):
+    # Rows are consecutive hours; only a share of the tiles is ever accessed, as in synth_access_data.csv.
+    # Access rates follow the POIs of each tile and their category's daily pattern, so the data has the
+    # spatial clustering and context dependence the real accesses have
+    rng = np.random.default_rng(seed)
+    grid_x, grid_y = grid_size
+    n_tiles = grid_x * grid_y
+
+    if poi_df is None:
+        poi_df = generate_poi_df(max(50, n_tiles // 4), grid_size, seed=seed)
+
+    hours = np.arange(n_rows)
+    days = hours // 24
+    columns = {}
+    for dc_name, dc_options in data_classes.items():
+        if dc_name == 'hour':
+            columns[dc_name] = hours % 24
+        elif dc_name == 'weekday':
+            columns[dc_name] = days % 7
+        elif dc_name == 'month':
+            columns[dc_name] = np.minimum((days % 365) * 12 // 365 + 1, 12)
+        else:
+            columns[dc_name] = rng.choice(dc_options, size=n_rows)
+
+    # same category order as calculate_poi_prate
+    is_edu = poi_df['isced_level'].notna().to_numpy()
+    is_leisure = ~is_edu & poi_df['leisure'].notna().to_numpy()
+    is_shop = ~is_edu & ~is_leisure & poi_df['shop'].notna().to_numpy()
+    is_tourism = ~is_edu & ~is_leisure & ~is_shop & poi_df['tourism'].notna().to_numpy()
+    is_other = ~(is_edu | is_leisure | is_shop | is_tourism)
+    category_counts = {
+        'educational': _poi_tile_counts(grid_size, poi_df, is_edu).ravel(),
+        'leisure': _poi_tile_counts(grid_size, poi_df, is_leisure).ravel(),
+        'commercial': _poi_tile_counts(grid_size, poi_df, is_shop).ravel(),
+        'tourism': _poi_tile_counts(grid_size, poi_df, is_tourism).ravel(),
+        'other': _poi_tile_counts(grid_size, poi_df, is_other).ravel()
+    }
+
+    # tiles with POIs are far more likely to be among the accessed ones
+    poi_counts = sum(category_counts.values())
+    weights = poi_counts + 0.05
+    n_accessed = max(1, int(n_tiles * tile_density))
+    accessed = rng.choice(n_tiles, size=n_accessed, replace=False, p=weights / weights.sum())
+
+    rates = np.full((n_rows, n_accessed), 0.02)
+    for category, profile in _category_profiles(columns, n_rows).items():
+        rates += rate_scale * np.outer(profile, category_counts[category][accessed])
+    counts = rng.poisson(rates)
+
+    for j, tile_idx in enumerate(accessed):
+        columns['{};{}'.format(tile_idx // grid_y, tile_idx % grid_y)] = counts[:, j]
+
+    return pd.DataFrame(columns)
+
+
+def generate_factor_states(n_states, data_classes, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        {dc_name: int(rng.choice(dc_options)) for dc_name, dc_options in data_classes.items()}
+        for i in range(n_states)
+    ]
+
+
+def generate_tile_sizes(grid_size, poi_df, base_bytes=2048, poi_bytes=4096, seed=0):
+    # Payload grows with the number of POIs in a tile: dense city tiles are large, empty forest tiles small
+    rng = np.random.default_rng(seed)
+    grid_x, grid_y = grid_size
+    poi_counts = _poi_tile_counts(grid_size, poi_df)
+
+    sizes = base_bytes * rng.lognormal(0, 0.3, size=(grid_x, grid_y)) + poi_bytes * poi_counts
+    return {(tile_x, tile_y): int(sizes[tile_x, tile_y]) for tile_x in range(grid_x) for tile_y in range(grid_y)}
+
+
+def generate_tile_sequences(n_sessions, session_length, grid_size, n_links=3, p_link=0.4, seed=0):
+    # Sessions are random walks: a client pans to a neighbouring tile or follows one of a few fixed
+    # "links" of the current tile (e.g. jumping to a related POI), which a transition model can learn
+    rng = np.random.default_rng(seed)
+    grid_x, grid_y = grid_size
+    n_tiles = grid_x * grid_y
+
+    popularity = rng.lognormal(mean=0.0, sigma=1.0, size=n_tiles)
+    links = rng.choice(n_tiles, size=(n_tiles, n_links), p=popularity / popularity.sum())
+    starts = rng.choice(n_tiles, size=n_sessions, p=popularity / popularity.sum())
+
+    sequences = []
+    for start in starts:
+        tile_idx = start
+        sequence = [(tile_idx // grid_y, tile_idx % grid_y)]
+
+        for i in range(session_length - 1):
+            if rng.uniform() < p_link:
+                tile_idx = links[tile_idx, rng.integers(n_links)]
+            else:
+                tile_x = min(max(tile_idx // grid_y + rng.integers(-1, 2), 0), grid_x - 1)
+                tile_y = min(max(tile_idx % grid_y + rng.integers(-1, 2), 0), grid_y - 1)
+                tile_idx = tile_x * grid_y + tile_y
+
+            sequence.append((int(tile_idx // grid_y), int(tile_idx % grid_y)))
+
+        sequences.append(sequence)
+
+    return sequences